@@ -1,8 +1,23 @@
-import json
+import orjson
 import os
+import mmap
+import re
 from collections import Counter
 import statistics
-from itertools import combinations
+import heapq
+from concurrent.futures import ThreadPoolExecutor
+from lotto_store import DATA_DIR, ROUNDS_FILE, ROUNDS_INDEX_FILE, LOAD_WORKERS, read_json, load_rounds_index
+
+CACHE_DIR = os.path.join(DATA_DIR, ".cache")
+# 범위 캐시 파일 이름 ("{시작}-{끝}.json"); 같은 폴더의 다른 캐시와 구분하는 데 사용
+_RANGE_CACHE_RE = re.compile(r"\d+-\d+\.json")
+
+def _count_numbers(nums):
+    """1~45 번호 출현 횟수를 번호를 인덱스로 하는 리스트로 반환"""
+    counts = [0] * 46
+    for n in nums:
+        counts[n] += 1
+    return counts
 
 class LottoAnalyzer:
     def __init__(self, start_round, end_round):
@@ -12,25 +27,86 @@ class LottoAnalyzer:
         self._load_all_data()
 
     def _get_file_path(self, round_num):
-        if 1 <= round_num <= 1000:
-            return os.path.join("lotto_data/1-1000", f"{round_num}.lotto")
-        elif 1001 <= round_num <= 2000:
-            return os.path.join("lotto_data/1001-2000", f"{round_num}.lotto")
-        else:
+        if round_num < 1:
             return None
+        # 1000회 단위 폴더 (1 -> 1-1000, 1207 -> 1001-2000)
+        lo = (round_num - 1) // 1000 * 1000 + 1
+        return f"{DATA_DIR}/{lo}-{lo + 999}/{round_num}.lotto"
+
+    def _load_from_jsonl(self, rounds, index):
+        """rounds.jsonl 을 mmap 하여 인덱스에 있는 회차만 잘라 읽음"""
+        with open(ROUNDS_FILE, 'rb') as f:
+            with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+                for r in rounds:
+                    offset, length = index[r]
+                    self.data.append(orjson.loads(mm[offset:offset + length]))
+
+    def _cache_path(self):
+        return os.path.join(CACHE_DIR, f"{self.start_round}-{self.end_round}.json")
+
+    def _load_cache(self):
+        """통합 파일이 마지막으로 갱신된 뒤에 저장된 범위 캐시가 있으면 사용"""
+        try:
+            if os.path.getmtime(self._cache_path()) <= os.path.getmtime(ROUNDS_INDEX_FILE):
+                return False
+            with open(self._cache_path(), 'rb') as f:
+                self.data = orjson.loads(f.read())
+            return True
+        except (OSError, orjson.JSONDecodeError):
+            return False
+
+    def _prune_cache(self, index_mtime):
+        """통합 파일보다 먼저 저장되어 더는 쓸 수 없는 범위 캐시를 삭제"""
+        with os.scandir(CACHE_DIR) as it:
+            for entry in it:
+                if (entry.is_file() and _RANGE_CACHE_RE.fullmatch(entry.name)
+                        and entry.stat().st_mtime <= index_mtime):
+                    os.remove(entry.path)
+
+    def _save_cache(self):
+        # 통합 파일이 없으면 캐시의 유효성을 판단할 수 없으므로 저장하지 않음
+        try:
+            index_mtime = os.path.getmtime(ROUNDS_INDEX_FILE)
+        except OSError:
+            return
+        try:
+            os.makedirs(CACHE_DIR, exist_ok=True)
+            self._prune_cache(index_mtime)
+            tmp_path = self._cache_path() + ".tmp"
+            with open(tmp_path, 'wb') as f:
+                f.write(orjson.dumps(self.data))
+            os.replace(tmp_path, self._cache_path())
+        except OSError as e:
+            print(f"Error writing cache: {e}")
 
     def _load_all_data(self):
         print(f"데이터 로딩 중 ({self.start_round}회 ~ {self.end_round}회)...")
-        for r in range(self.start_round, self.end_round + 1):
-            path = self._get_file_path(r)
-            if path and os.path.exists(path):
-                try:
-                    with open(path, 'r', encoding='utf-8') as f:
-                        self.data.append(json.load(f))
-                except Exception as e:
-                    print(f"Error reading {r}회: {e}")
+        if self._load_cache():
+            print(f"총 {len(self.data)}개 회차 데이터 로드 완료 (캐시).\n")
+            return
+
+        rounds = range(self.start_round, self.end_round + 1)
+        index = load_rounds_index()
+        if index:
+            try:
+                self._load_from_jsonl([r for r in rounds if r in index], index)
+            except (FileNotFoundError, orjson.JSONDecodeError):
+                # 인덱스와 통합 파일이 어긋나 있으면 개별 파일에서 다시 읽음
+                self.data = []
+                index = {}
+
+        # 통합 파일에 없는 회차는 개별 파일에서 읽음 (없는 파일은 open 실패로 건너뜀)
+        paths = [self._get_file_path(r) for r in rounds if r not in index]
+        paths = [p for p in paths if p]
+        # 회차 파일을 병렬로 읽어 파일별 I/O 대기 시간을 겹침
+        with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+            self.data.extend(d for d in executor.map(read_json, paths) if d is not None)
         # 회차순 정렬 보장
         self.data.sort(key=lambda x: x['round'])
+        # 캐시 유효성은 rounds.idx 시각으로만 판단하므로, 개별 파일에서 읽었거나
+        # 아직 없는 회차가 섞인 범위는 캐시하지 않음 (그 파일이 바뀌어도 알 수 없음)
+        if not paths:
+            self._save_cache()
         print(f"총 {len(self.data)}개 회차 데이터 로드 완료.\n")
 
     def _print_group_stats(self, group, title):
@@ -45,8 +121,10 @@ class LottoAnalyzer:
             sums.append(d['analysis']['sum_value'])
             
         avg_sum = statistics.mean(sums) if sums else 0
-        top_nums = Counter(nums).most_common(5)
-        top_str = ", ".join([f"{n}({c})" for n, c in top_nums])
+        counts = _count_numbers(nums)
+        # 동률은 먼저 등장한 번호 우선 (Counter.most_common 과 동일한 순서)
+        top_nums = heapq.nlargest(5, dict.fromkeys(nums), key=counts.__getitem__)
+        top_str = ", ".join([f"{n}({counts[n]})" for n in top_nums])
         
         print(f"  [{title}] (대상 {len(group)}회)")
         print(f"    - 평균 총합: {avg_sum:.1f}")
@@ -82,8 +160,12 @@ class LottoAnalyzer:
             sums = [d['analysis']['sum_value'] for d in chunk]
             avg_sum = statistics.mean(sums)
             nums = [n for d in chunk for n in d['numbers']]
-            top_num = Counter(nums).most_common(1)
-            top_str = f"{top_num[0][0]}번({top_num[0][1]}회)" if top_num else "-"
+            if nums:
+                counts = _count_numbers(nums)
+                top_num = max(dict.fromkeys(nums), key=counts.__getitem__)
+                top_str = f"{top_num}번({counts[top_num]}회)"
+            else:
+                top_str = "-"
             print(f"  [{start}회~{end}회] 평균합: {avg_sum:5.1f} | 최다출현: {top_str}")
 
     # =================================================================
@@ -97,43 +179,32 @@ class LottoAnalyzer:
             print("  데이터가 부족하여 고급 분석을 수행할 수 없습니다.")
             return
 
+        # 각 회차 번호를 45비트 마스크로 한 번만 변환 (n번 -> n번째 비트)
+        masks = [sum(1 << n for n in d['numbers']) for d in self.data]
+
         # 1. 이월수 (Carryover) 분석
         # 직전 회차의 번호가 이번 회차에 몇 개나 다시 나왔는가?
-        carryover_counts = Counter()
-        for i in range(1, len(self.data)):
-            prev_nums = set(self.data[i-1]['numbers'])
-            curr_nums = set(self.data[i]['numbers'])
-            intersection = prev_nums & curr_nums
-            carryover_counts[len(intersection)] += 1
+        carryover_counts = [0] * 7
+        for prev_mask, curr_mask in zip(masks, masks[1:]):
+            carryover_counts[bin(prev_mask & curr_mask).count('1')] += 1
             
         print("\n  1. 이월수(전회차 번호 재출현) 통계:")
-        total_analyzed = sum(carryover_counts.values())
-        for count, freq in sorted(carryover_counts.items()):
+        total_analyzed = len(masks) - 1
+        for count, freq in enumerate(carryover_counts):
+            if not freq: continue
             ratio = freq / total_analyzed * 100
             print(f"    - {count}개 이월: {freq}회 ({ratio:.1f}%)")
 
         # 2. 연번 (Consecutive Numbers) 분석
-        # 번호가 연속으로 이어지는 경우 (예: 12, 13)
-        consecutive_count = 0
-        for d in self.data:
-            nums = sorted(d['numbers'])
-            has_consecutive = False
-            for i in range(len(nums) - 1):
-                if nums[i+1] == nums[i] + 1:
-                    has_consecutive = True
-                    break
-            if has_consecutive:
-                consecutive_count += 1
+        # 번호가 연속으로 이어지는 경우 (예: 12, 13) -> 인접한 두 비트가 모두 켜짐
+        consecutive_count = sum(1 for m in masks if m & (m >> 1))
         
         print(f"\n  2. 연번(연속된 숫자) 출현 빈도:")
         print(f"    - 연번 포함 회차: {consecutive_count}회 ({consecutive_count/len(self.data)*100:.1f}%)")
 
         # 3. 끝수 (Ending Digit) 분석
         # 각 번호의 1의 자리 숫자 빈도
-        ending_digits = Counter()
-        for d in self.data:
-            for num in d['numbers']:
-                ending_digits[num % 10] += 1
+        ending_digits = Counter(num % 10 for d in self.data for num in d['numbers'])
         
         print(f"\n  3. 끝수(1의 자리) 출현 순위:")
         print("    (예: 1, 11, 21, 31, 41 -> 1끝수)")
@@ -143,16 +214,23 @@ class LottoAnalyzer:
 
         # 4. 동반 출현 (Co-occurrence) 분석 - 궁합수
         # 가장 자주 같이 나오는 번호 쌍
-        pair_counts = Counter()
+        # (a, b) 쌍을 a*46+b 단일 인덱스로 세어 튜플 생성/해시를 없앰
+        pair_counts = [0] * (46 * 46)
+        first_seen = []  # 동률일 때 처음 나온 쌍을 우선하기 위한 등장 순서
         for d in self.data:
             nums = sorted(d['numbers'])
             # 6개 번호 중 2개씩 짝지어 카운트
-            for pair in combinations(nums, 2):
-                pair_counts[pair] += 1
+            for i in range(len(nums) - 1):
+                base = nums[i] * 46
+                for j in range(i + 1, len(nums)):
+                    idx = base + nums[j]
+                    if not pair_counts[idx]:
+                        first_seen.append(idx)
+                    pair_counts[idx] += 1
         
         print(f"\n  4. 베스트 궁합수 (동반 출현 Top 5):")
-        for pair, count in pair_counts.most_common(5):
-            print(f"    - {pair[0]}번 & {pair[1]}번: 함께 {count}회 출현")
+        for idx in heapq.nlargest(5, first_seen, key=pair_counts.__getitem__):
+            print(f"    - {idx // 46}번 & {idx % 46}번: 함께 {pair_counts[idx]}회 출현")
 
 if __name__ == "__main__":
     # 분석 범위 설정
@@ -1,36 +1,61 @@
 import os
-import json
 import time
+import functools
+import mmap
 import re
 import shutil
+import threading
+import queue
+import itertools
+import orjson
+import requests
+from collections import Counter
+from concurrent.futures import ThreadPoolExecutor
 from selenium import webdriver
 from selenium.webdriver.chrome.service import Service
 from selenium.webdriver.chrome.options import Options
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from selenium.common.exceptions import SessionNotCreatedException
 from webdriver_manager.chrome import ChromeDriverManager
 from bs4 import BeautifulSoup
+from lotto_store import DATA_DIR, ROUNDS_FILE, ROUNDS_INDEX_FILE, INDEX_RECORD, LOAD_WORKERS, read_json, load_rounds_index
 
 # Configuration
-DATA_DIR = 'lotto_data'
 TARGET_URL = 'https://www.dhlottery.co.kr/lt645/result'
+API_URL = 'https://www.dhlottery.co.kr/common.do'
+USER_AGENT = 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
+# Browser state lives outside DATA_DIR, which is walked recursively for round files
+BROWSER_CACHE_DIR = '.cache'
+CHROMEDRIVER_PATH_FILE = os.path.join(BROWSER_CACHE_DIR, 'chromedriver_path')
+CHROMEDRIVER_MAX_AGE = 7 * 24 * 60 * 60
 LATEST_FILE = 'latest.lotto'
 FREQUENCY_FILE = 'frequency.lotto'
+RESULT_ROW_SELECTOR = '#tableMoDiv .mo-table-list'
+# Highest round whose files are known to already carry analysis data
+ANALYSIS_MARKER_FILE = '.analysis_version'
+API_CONCURRENCY = 20
+SAVE_WORKERS = 16
+SELENIUM_WORKERS = 4
 
 def ensure_data_dir():
-    if not os.path.exists(DATA_DIR):
-        os.makedirs(DATA_DIR)
+    os.makedirs(DATA_DIR, exist_ok=True)
+
+@functools.lru_cache(maxsize=64)
+def _round_group_folder(group):
+    start = group * 1000 + 1
+    end = start + 999
+    folder_name = f"{start}-{end}"
+    return os.path.join(DATA_DIR, folder_name)
 
 def get_round_folder(round_num):
     """
     Returns the folder path for a given round number based on 1000-round grouping.
     e.g., 1 -> "1-1000", 1207 -> "1001-2000"
+    Paths are memoized per group, so every round in a group shares one string.
     """
-    start = ((round_num - 1) // 1000) * 1000 + 1
-    end = start + 999
-    folder_name = f"{start}-{end}"
-    return os.path.join(DATA_DIR, folder_name)
+    return _round_group_folder((round_num - 1) // 1000)
 
 def migrate_existing_files():
     """
@@ -41,21 +66,23 @@ def migrate_existing_files():
         return
 
     count = 0
-    for filename in os.listdir(DATA_DIR):
+    with os.scandir(DATA_DIR) as it:
+        entries = list(it)
+    for entry in entries:
+        filename = entry.name
         # Skip special files and directories
         if filename == LATEST_FILE or filename == FREQUENCY_FILE:
             continue
         
-        file_path = os.path.join(DATA_DIR, filename)
+        file_path = entry.path
         
         # Process only .lotto files in the root directory
-        if os.path.isfile(file_path) and filename.endswith('.lotto'):
+        if entry.is_file() and filename.endswith('.lotto'):
             try:
                 round_num = int(filename.split('.')[0])
                 target_folder = get_round_folder(round_num)
                 
-                if not os.path.exists(target_folder):
-                    os.makedirs(target_folder)
+                os.makedirs(target_folder, exist_ok=True)
                 
                 target_path = os.path.join(target_folder, filename)
                 shutil.move(file_path, target_path)
@@ -68,23 +95,90 @@ def migrate_existing_files():
     if count > 0:
         print(f"Migrated {count} files to subdirectories.")
 
-def get_latest_round_and_setup_driver():
+_install_lock = threading.Lock()
+
+@functools.lru_cache(maxsize=None)
+def get_chromedriver_path():
+    """
+    Returns the chromedriver binary path. A path installed within the last
+    CHROMEDRIVER_MAX_AGE seconds is reused from CHROMEDRIVER_PATH_FILE, so
+    ChromeDriverManager only hits the network about once a week.
+    """
+    # Worker threads may start browsers together; install the driver one at a time
+    with _install_lock:
+        try:
+            if time.time() - os.path.getmtime(CHROMEDRIVER_PATH_FILE) < CHROMEDRIVER_MAX_AGE:
+                with open(CHROMEDRIVER_PATH_FILE, 'r', encoding='utf-8') as f:
+                    path = f.read().strip()
+                if os.access(path, os.X_OK):
+                    return path
+        except OSError:
+            pass
+        
+        path = ChromeDriverManager().install()
+        os.makedirs(BROWSER_CACHE_DIR, exist_ok=True)
+        with open(CHROMEDRIVER_PATH_FILE, 'w', encoding='utf-8') as f:
+            f.write(path)
+        return path
+
+def refresh_chromedriver_path():
+    """
+    Drops the cached chromedriver path and installs a fresh one.
+    """
+    get_chromedriver_path.cache_clear()
+    try:
+        os.remove(CHROMEDRIVER_PATH_FILE)
+    except FileNotFoundError:
+        pass
+    return get_chromedriver_path()
+
+def _chrome_options(profile_dir=None):
     options = Options()
     options.add_argument('--headless')
     options.add_argument('--no-sandbox')
     options.add_argument('--disable-dev-shm-usage')
-    options.add_argument('user-agent=Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36')
+    options.add_argument(f'user-agent={USER_AGENT}')
+    if profile_dir:
+        options.add_argument(f'--user-data-dir={profile_dir}')
+    return options
+
+def create_driver(slot=0):
+    """
+    Starts a headless Chrome session and opens the result page.
+    Each pool slot keeps its own browser profile under BROWSER_CACHE_DIR, so
+    the HTTP cache survives between runs while concurrent sessions never
+    share a profile directory.
+    """
+    profile_dir = os.path.abspath(os.path.join(BROWSER_CACHE_DIR, f'chrome-profile-{slot}'))
     
-    service = Service(ChromeDriverManager().install())
-    driver = webdriver.Chrome(service=service, options=options)
+    try:
+        driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=_chrome_options(profile_dir))
+    except SessionNotCreatedException as e:
+        if 'user data directory' in str(e).lower():
+            # The profile is held by another Chrome (e.g. a leftover process),
+            # so run this session on a throwaway profile instead
+            print(f"Chrome profile {profile_dir} is in use, starting without it")
+            driver = webdriver.Chrome(service=Service(get_chromedriver_path()), options=_chrome_options())
+        else:
+            # The cached driver no longer matches the installed Chrome version
+            driver = webdriver.Chrome(service=Service(refresh_chromedriver_path()), options=_chrome_options(profile_dir))
     
     try:
         driver.get(TARGET_URL)
         WebDriverWait(driver, 10).until(
             EC.presence_of_element_located((By.ID, "srchStrLtEpsd"))
         )
+    except Exception:
+        driver.quit()
+        raise
+    return driver
+
+def get_latest_round_and_setup_driver():
+    driver = None
+    try:
+        driver = create_driver()
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        soup = BeautifulSoup(driver.page_source, 'lxml')
         select_tag = soup.find('select', id='srchStrLtEpsd')
         
         latest_round = 0
@@ -102,55 +196,100 @@ def get_latest_round_and_setup_driver():
             driver.quit()
         return 0, None
 
-def get_saved_rounds():
-    saved = []
+def get_saved_rounds(round_files=None):
     if not os.path.exists(DATA_DIR):
-        return saved
-    
-    # Walk through all subdirectories to find .lotto files
-    for root, dirs, files in os.walk(DATA_DIR):
-        for filename in files:
-            if filename.endswith('.lotto') and filename != LATEST_FILE and filename != FREQUENCY_FILE:
-                try:
-                    round_num = int(filename.split('.')[0])
-                    saved.append(round_num)
-                except ValueError:
-                    pass
-    return sorted(saved)
+        return []
+    if round_files is None:
+        round_files = scan_lotto_files()
+    return sorted(round_num for round_num, _ in round_files)
+
+class _DigitsOnlyTable(dict):
+    """
+    str.translate table that keeps ASCII digits and deletes everything else.
+    Non-digit code points are added on first sight, so the table stays small.
+    """
+    def __missing__(self, codepoint):
+        self[codepoint] = None
+        return None
+
+_KEEP_DIGITS = _DigitsOnlyTable((c, c) for c in range(ord('0'), ord('9') + 1))
+_ROUND_RE = re.compile(r'\d+')
+
+# Returns the round text of the first result row, or null if no row is shown yet
+_FIRST_ROUND_JS = f"""
+const span = document.querySelector('{RESULT_ROW_SELECTOR} div.round-wrap span');
+return span ? span.textContent : null;
+"""
+
+# Returns the text of each result row under #tableMoDiv, or null if it is missing
+_EXTRACT_RESULTS_JS = """
+const container = document.getElementById('tableMoDiv');
+if (!container) return null;
+const text = el => el.textContent;
+return Array.from(container.querySelectorAll('div.mo-table-list'), item => {
+    const roundWrap = item.querySelector('div.round-wrap');
+    const price = item.querySelector('span.txt-price');
+    return {
+        spans: roundWrap ? Array.from(roundWrap.querySelectorAll('span'), text) : null,
+        balls: Array.from(item.querySelectorAll('div.result-ballBox'),
+                          box => Array.from(box.querySelectorAll('div.result-ball'), text)),
+        price: price ? price.textContent : null
+    };
+});
+"""
+
+def _parse_digits(text):
+    return int(text.translate(_KEEP_DIGITS) or 0)
 
 def parse_money(money_str):
-    clean = re.sub(r'[^\d]', '', money_str)
-    return int(clean) if clean else 0
+    return _parse_digits(money_str)
 
 def parse_winners(winner_str):
-    clean = re.sub(r'[^\d]', '', winner_str)
-    return int(clean) if clean else 0
+    return _parse_digits(winner_str)
 
-def calculate_analysis_data(numbers, bonus):
-    odds = sum(1 for n in numbers if n % 2 != 0)
-    evens = 6 - odds
-    odd_even_ratio = f"{odds}:{evens}"
-    
-    sum_value = sum(numbers)
+def _analysis_core(numbers):
+    """
+    Returns (odds, sum_value, ac_value, highs) for six winning numbers.
+    """
+    odds = 0
+    highs = 0
+    sum_value = 0
+    for n in numbers:
+        odds += n & 1
+        highs += n >= 23
+        sum_value += n
     
-    diffs = set()
+    # Differences are within 1..44, so a bitmask replaces the set of diffs
+    mask = 0
     sorted_nums = sorted(numbers)
     for i in range(len(sorted_nums)):
+        a = sorted_nums[i]
         for j in range(i + 1, len(sorted_nums)):
-            diffs.add(sorted_nums[j] - sorted_nums[i])
-    ac_value = len(diffs) - 5
-    
-    highs = sum(1 for n in numbers if n >= 23)
-    lows = 6 - highs
-    high_low_ratio = f"{highs}:{lows}"
+            mask |= 1 << (sorted_nums[j] - a)
+    # bin().count() instead of int.bit_count(), which needs Python 3.10
+    ac_value = bin(mask).count('1') - 5
     
+    return odds, sum_value, ac_value, highs
+
+def _format_analysis(core):
+    odds, sum_value, ac_value, highs = core
     return {
-        'odd_even_ratio': odd_even_ratio,
+        'odd_even_ratio': f"{odds}:{6 - odds}",
         'sum_value': sum_value,
         'ac_value': ac_value,
-        'high_low_ratio': high_low_ratio
+        'high_low_ratio': f"{highs}:{6 - highs}"
     }
 
+def calculate_analysis_data(numbers, bonus):
+    return _format_analysis(_analysis_core(numbers))
+
+def calculate_analysis_batch(numbers_list):
+    """
+    Computes analysis data for many rounds at once.
+    Returns a list of analysis dicts in the same order as numbers_list.
+    """
+    return [_format_analysis(_analysis_core(numbers)) for numbers in numbers_list]
+
 def fetch_range_with_selenium(driver, start_round, end_round):
     print(f"Fetching rounds {start_round} to {end_round}...")
     try:
@@ -160,42 +299,46 @@ def fetch_range_with_selenium(driver, start_round, end_round):
             document.getElementById('btnWnNoPop').click();
         """)
         
-        time.sleep(2)
+        # Wait only as long as the search takes instead of a fixed sleep. The
+        # rows may be replaced or updated in place, so wait on their content:
+        # the first row must show a round from the requested range
+        def first_row_in_range(d):
+            round_text = d.execute_script(_FIRST_ROUND_JS)
+            match = _ROUND_RE.search(round_text) if round_text else None
+            return match is not None and start_round <= int(match.group()) <= end_round
+        WebDriverWait(driver, 10).until(first_row_in_range)
         
-        soup = BeautifulSoup(driver.page_source, 'html.parser')
+        # Pull the raw text of every result row in one round trip instead of
+        # transferring page_source and re-parsing the whole page in Python
+        items = driver.execute_script(_EXTRACT_RESULTS_JS)
         
         results = []
-        container = soup.find('div', id='tableMoDiv')
-        if not container:
+        if items is None:
             print("Could not find result container (tableMoDiv)")
             return []
-            
-        items = container.find_all('div', class_='mo-table-list')
         
         for item in items:
             try:
-                round_wrap = item.find('div', class_='round-wrap')
-                if not round_wrap: continue
+                spans = item['spans']
+                if spans is None: continue
                 
-                spans = round_wrap.find_all('span')
-                round_text = spans[0].text
-                round_num = int(re.search(r'\d+', round_text).group())
+                round_text = spans[0]
+                round_num = int(_ROUND_RE.search(round_text).group())
+                if not start_round <= round_num <= end_round:
+                    continue
                 
-                ball_boxes = item.find_all('div', class_='result-ballBox')
+                ball_boxes = item['balls']
                 if len(ball_boxes) < 2:
                     continue
                     
-                win_balls = ball_boxes[0].find_all('div', class_='result-ball')
-                numbers = [int(b.text) for b in win_balls]
+                numbers = [int(b) for b in ball_boxes[0]]
                 
-                bonus_ball = ball_boxes[1].find('div', class_='result-ball')
-                bonus = int(bonus_ball.text) if bonus_ball else 0
+                bonus = int(ball_boxes[1][0]) if ball_boxes[1] else 0
                 
-                winners_text = spans[2].text
+                winners_text = spans[2]
                 winners = parse_winners(winners_text)
                 
-                price_span = item.find('span', class_='txt-price')
-                amount = parse_money(price_span.text)
+                amount = parse_money(item['price'])
                 
                 analysis = calculate_analysis_data(numbers, bonus)
                 
@@ -217,87 +360,377 @@ def fetch_range_with_selenium(driver, start_round, end_round):
         print(f"Error in selenium fetch: {e}")
         return []
 
-def save_result(result):
-    round_num = result['round']
-    folder_path = get_round_folder(round_num)
+def fetch_ranges_with_selenium(driver, ranges):
+    """
+    Fetches (start_round, end_round) chunks across up to SELENIUM_WORKERS
+    browser sessions. The given driver seeds the pool; extra sessions are
+    started on demand and quit once all chunks are done.
+    """
+    pool = queue.Queue()
+    pool.put(driver)
+    started = []
+    slots = itertools.count(1)
+    
+    def fetch(chunk):
+        try:
+            worker_driver = pool.get_nowait()
+        except queue.Empty:
+            try:
+                worker_driver = create_driver(next(slots))
+                started.append(worker_driver)
+            except Exception as e:
+                # Never drop the chunk: the seed driver always goes back to
+                # the pool, so wait for a running session instead
+                print(f"Error starting browser for rounds {chunk[0]} to {chunk[1]}, waiting for a running one: {e}")
+                worker_driver = pool.get()
+        try:
+            return fetch_range_with_selenium(worker_driver, *chunk)
+        finally:
+            pool.put(worker_driver)
     
-    if not os.path.exists(folder_path):
-        os.makedirs(folder_path)
+    results = []
+    try:
+        with ThreadPoolExecutor(max_workers=min(SELENIUM_WORKERS, len(ranges)) or 1) as executor:
+            for chunk_results in executor.map(fetch, ranges):
+                results.extend(chunk_results)
+    finally:
+        for worker_driver in started:
+            worker_driver.quit()
+    return results
+
+def fetch_round_with_api(session, round_num):
+    """
+    Fetches a single round from the JSON endpoint behind the result page.
+    Returns None if the endpoint does not return the round.
+    """
+    try:
+        response = session.get(API_URL, params={'method': 'getLottoNumber', 'drwNo': round_num}, timeout=10)
+        response.raise_for_status()
+        data = orjson.loads(response.content)
+        if data.get('returnValue') != 'success':
+            return None
         
-    filename = os.path.join(folder_path, f"{round_num}.lotto")
-    with open(filename, 'w', encoding='utf-8') as f:
-        json.dump(result, f, ensure_ascii=False, indent=4)
+        numbers = [data[f'drwtNo{i}'] for i in range(1, 7)]
+        bonus = data['bnusNo']
+        return {
+            'round': data['drwNo'],
+            'numbers': numbers,
+            'bonus': bonus,
+            'winners': data.get('firstPrzwnerCo', 0),
+            'amount_per_winner': data.get('firstWinamnt', 0),
+            'analysis': calculate_analysis_data(numbers, bonus)
+        }
+    except Exception as e:
+        print(f"Error fetching round {round_num} from API: {e}")
+        return None
+
+def fetch_rounds_with_api(rounds):
+    """
+    Fetches the given rounds one HTTP GET each, without rendering the result
+    page. Up to API_CONCURRENCY requests are in flight at once.
+    Rounds the endpoint cannot return are left out of the result.
+    """
+    print(f"Fetching {len(rounds)} rounds ({rounds[0]} to {rounds[-1]}) from API...")
+    local = threading.local()
+    
+    def fetch(round_num):
+        # requests.Session is not thread-safe, so each worker keeps its own
+        if not hasattr(local, 'session'):
+            local.session = requests.Session()
+            local.session.headers.update({'User-Agent': USER_AGENT})
+        return fetch_round_with_api(local.session, round_num)
+    
+    with ThreadPoolExecutor(max_workers=API_CONCURRENCY) as executor:
+        results = executor.map(fetch, rounds)
+        return [result for result in results if result is not None]
+
+def get_round_file_path(round_num):
+    return os.path.join(get_round_folder(round_num), f"{round_num}.lotto")
+
+def _dump_json(path, data):
+    """
+    Serializes data to bytes up front and hands it to the file in one write()
+    call instead of letting the encoder write piece by piece.
+    """
+    with open(path, 'wb') as f:
+        f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
+
+def save_result(result, make_folder=True):
+    round_num = result['round']
+    if make_folder:
+        os.makedirs(get_round_folder(round_num), exist_ok=True)
+        
+    filename = get_round_file_path(round_num)
+    _dump_json(filename, result)
     print(f"Saved {filename}")
 
+def save_results(results):
+    """
+    Saves a batch of fetched rounds: each target folder is created once,
+    the per-round files are written in parallel, then the consolidated
+    rounds file is appended in round order.
+    """
+    results = sorted(results, key=lambda r: r['round'])
+    for folder_path in {get_round_folder(r['round']) for r in results}:
+        os.makedirs(folder_path, exist_ok=True)
+    with ThreadPoolExecutor(max_workers=SAVE_WORKERS) as executor:
+        list(executor.map(functools.partial(save_result, make_folder=False), results))
+    append_to_jsonl(results)
+
+def append_to_jsonl(results):
+    """
+    Appends round records to the consolidated rounds file and its index.
+    Does nothing until the shard has been built by migrate_to_jsonl(), and
+    rebuilds it instead of appending after a torn earlier write. The round
+    files are saved first, so the rebuild picks up these results too.
+    """
+    if not results or not os.path.exists(ROUNDS_FILE):
+        return
+    if not rounds_shard_is_consistent():
+        migrate_to_jsonl()
+        return
+
+    index = bytearray()
+    with open(ROUNDS_FILE, 'ab') as f:
+        offset = f.tell()
+        for result in results:
+            line = orjson.dumps(result)
+            f.write(line + b'\n')
+            index += INDEX_RECORD.pack(result['round'], offset, len(line))
+            offset += len(line) + 1
+    with open(ROUNDS_INDEX_FILE, 'ab') as f:
+        f.write(index)
+
 def save_latest_round_number(round_num):
     filename = os.path.join(DATA_DIR, LATEST_FILE)
     with open(filename, 'w', encoding='utf-8') as f:
         f.write(str(round_num))
     print(f"Updated {filename} with round {round_num}")
 
-def update_existing_files_with_analysis():
+def scan_lotto_files(directory=DATA_DIR):
+    """
+    Returns (round_num, path) for every round .lotto file under DATA_DIR.
+    Uses os.scandir so the entry type and path come from the directory
+    listing instead of separate stat and join calls. Files whose name is not
+    a round number (latest, frequency, star predictions) are skipped.
+    """
+    found = []
+    with os.scandir(directory) as it:
+        for entry in it:
+            if entry.is_dir():
+                found.extend(scan_lotto_files(entry.path))
+            elif entry.name.endswith('.lotto'):
+                try:
+                    found.append((int(entry.name[:-len('.lotto')]), entry.path))
+                except ValueError:
+                    pass
+    return found
+
+def find_missing_analysis(filepath):
+    """
+    Returns (filepath, data) if the round file has numbers but no analysis data,
+    (filepath, None) if there is nothing to update, or None if it cannot be read.
+    """
+    data = read_json(filepath)
+    if not isinstance(data, dict):
+        return None
+    if 'analysis' not in data and data.get('numbers', []):
+        return filepath, data
+    return filepath, None
+
+def load_analysis_marker():
+    """
+    Returns the highest round already backfilled with analysis data, or 0.
+    """
+    try:
+        with open(os.path.join(DATA_DIR, ANALYSIS_MARKER_FILE), 'r', encoding='utf-8') as f:
+            return int(f.read().strip() or 0)
+    except (FileNotFoundError, ValueError):
+        return 0
+
+def save_analysis_marker(round_num):
+    with open(os.path.join(DATA_DIR, ANALYSIS_MARKER_FILE), 'w', encoding='utf-8') as f:
+        f.write(str(round_num))
+
+def write_round_file(item):
+    filepath, data = item
+    try:
+        _dump_json(filepath, data)
+        return True
+    except Exception as e:
+        print(f"Error updating {os.path.basename(filepath)}: {e}")
+        return False
+
+def update_existing_files_with_analysis(round_files=None):
     print("Checking and updating existing files with analysis data...")
     if not os.path.exists(DATA_DIR):
-        return
+        return 0
+    if round_files is None:
+        round_files = scan_lotto_files()
 
-    updated_count = 0
-    # Walk through all subdirectories
-    for root, dirs, files in os.walk(DATA_DIR):
-        for filename in files:
-            if filename.endswith('.lotto') and filename != LATEST_FILE and filename != FREQUENCY_FILE:
-                filepath = os.path.join(root, filename)
-                try:
-                    with open(filepath, 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                    
-                    if 'analysis' not in data:
-                        numbers = data.get('numbers', [])
-                        bonus = data.get('bonus', 0)
-                        
-                        if numbers:
-                            data['analysis'] = calculate_analysis_data(numbers, bonus)
-                            
-                            with open(filepath, 'w', encoding='utf-8') as f:
-                                json.dump(data, f, ensure_ascii=False, indent=4)
-                            updated_count += 1
-                except Exception as e:
-                    print(f"Error updating {filename}: {e}")
+    # Rounds up to the marker were already backfilled, so skip parsing them
+    marker = load_analysis_marker()
+    pending_files = sorted((round_num, p) for round_num, p in round_files if round_num > marker)
+    paths = [p for _, p in pending_files]
+
+    # Files are independent, so read and rewrite them in parallel
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        checked = list(executor.map(find_missing_analysis, paths))
+        pending = [item for item in checked if item and item[1] is not None]
+        
+        # Compute analysis for all pending rounds in one batch
+        analyses = calculate_analysis_batch([data['numbers'] for _, data in pending])
+        for (_, data), analysis in zip(pending, analyses):
+            data['analysis'] = analysis
+        
+        written = dict(zip((filepath for filepath, _ in pending), executor.map(write_round_file, pending)))
+    
+    # Advance the marker up to the first round that could not be read or rewritten
+    new_marker = marker
+    for (round_num, filepath), item in zip(pending_files, checked):
+        if item is None or not written.get(filepath, True):
+            break
+        new_marker = round_num
+    if new_marker > marker:
+        save_analysis_marker(new_marker)
+    updated_count = sum(written.values())
     
     if updated_count > 0:
         print(f"Updated {updated_count} files with analysis data.")
     else:
         print("All existing files already have analysis data.")
+    return updated_count
+
+def migrate_to_jsonl(round_files=None):
+    """
+    Consolidates all round .lotto files into a single rounds.jsonl file
+    (one JSON record per line, ordered by round) and writes a rounds.idx
+    sidecar of (round_num, byte_offset, length) records for random access.
+    The per-round files are kept as they are served to the website and stay
+    the source of truth; the shard is a local, gitignored derived copy.
+    """
+    print("Building consolidated rounds file...")
+    if round_files is None:
+        round_files = scan_lotto_files()
+    paths = dict(round_files)
+
+    rounds = sorted(paths)
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        records = list(executor.map(read_json, [paths[r] for r in rounds]))
 
-def update_frequency_data():
+    # Write both files under temporary names and swap them in, so a crash
+    # never leaves a half-written shard; rounds_shard_is_consistent() catches
+    # a crash between the two renames
+    offset = 0
+    count = 0
+    with open(ROUNDS_FILE + '.tmp', 'wb') as rounds_f, \
+            open(ROUNDS_INDEX_FILE + '.tmp', 'wb') as index_f:
+        for round_num, data in zip(rounds, records):
+            if data is None:
+                continue
+            line = orjson.dumps(data)
+            rounds_f.write(line + b'\n')
+            index_f.write(INDEX_RECORD.pack(round_num, offset, len(line)))
+            offset += len(line) + 1
+            count += 1
+    os.replace(ROUNDS_FILE + '.tmp', ROUNDS_FILE)
+    os.replace(ROUNDS_INDEX_FILE + '.tmp', ROUNDS_INDEX_FILE)
+
+    print(f"Consolidated {count} rounds into {ROUNDS_FILE}.")
+
+def read_round_numbers(filepath):
+    """
+    Returns (numbers, bonus) from a round file, or None if it cannot be read.
+    """
+    data = read_json(filepath)
+    if not isinstance(data, dict):
+        return None
+    return data.get('numbers', []), data.get('bonus', 0)
+
+def read_rounds_jsonl():
+    """
+    Returns {round_num: (numbers, bonus)} by scanning rounds.jsonl sequentially
+    through mmap, or None if the consolidated file has not been built yet or
+    holds a record that cannot be parsed (callers then read the round files).
+    A round appended more than once keeps its last record, and a trailing
+    line without a newline (an interrupted append) is ignored.
+    """
+    try:
+        f = open(ROUNDS_FILE, 'rb')
+    except FileNotFoundError:
+        return None
+
+    entries = {}
+    with f:
+        if os.fstat(f.fileno()).st_size == 0:
+            return entries
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as mm:
+            for line in iter(mm.readline, b''):
+                if not line.endswith(b'\n'):
+                    break
+                try:
+                    data = orjson.loads(line)
+                except orjson.JSONDecodeError as e:
+                    print(f"Error reading {ROUNDS_FILE}: {e}")
+                    return None
+                entries[data['round']] = (data.get('numbers', []), data.get('bonus', 0))
+    return entries
+
+def rounds_shard_is_consistent():
+    """
+    Returns True if rounds.jsonl exists and rounds.idx describes it exactly:
+    whole index records only, and the last record ends at a newline that is
+    the last byte of the file. An interrupted append breaks one of these.
+    """
+    try:
+        with open(ROUNDS_INDEX_FILE, 'rb') as f:
+            index = f.read()
+        with open(ROUNDS_FILE, 'rb') as f:
+            size = os.fstat(f.fileno()).st_size
+            if len(index) % INDEX_RECORD.size:
+                return False
+            if not index:
+                return size == 0
+            _, offset, length = INDEX_RECORD.unpack_from(index, len(index) - INDEX_RECORD.size)
+            if offset + length + 1 != size:
+                return False
+            f.seek(offset + length)
+            return f.read(1) == b'\n'
+    except FileNotFoundError:
+        return False
+
+def update_frequency_data(round_files=None):
     print("Updating frequency data...")
-    frequency = {str(i): {'main': 0, 'bonus': 0, 'total': 0} for i in range(1, 46)}
     
     if not os.path.exists(DATA_DIR):
         return
 
-    count = 0
-    # Walk through all subdirectories
-    for root, dirs, files in os.walk(DATA_DIR):
-        for filename in files:
-            if filename.endswith('.lotto') and filename != LATEST_FILE and filename != FREQUENCY_FILE:
-                try:
-                    with open(os.path.join(root, filename), 'r', encoding='utf-8') as f:
-                        data = json.load(f)
-                        numbers = data.get('numbers', [])
-                        bonus = data.get('bonus', 0)
-                        
-                        for num in numbers:
-                            if 1 <= num <= 45:
-                                frequency[str(num)]['main'] += 1
-                                frequency[str(num)]['total'] += 1
-                        
-                        if 1 <= bonus <= 45:
-                            frequency[str(bonus)]['bonus'] += 1
-                            frequency[str(bonus)]['total'] += 1
-                        count += 1
-                except Exception as e:
-                    print(f"Error reading {filename}: {e}")
+    if round_files is None:
+        round_files = scan_lotto_files()
+
+    # Scan the consolidated rounds file if it exists, then read the round files
+    # it does not cover (all of them without a shard, or rounds that arrived
+    # without going through save_results, e.g. pulled from another checkout)
+    shard_entries = read_rounds_jsonl() or {}
+    paths = [p for round_num, p in round_files if round_num not in shard_entries]
+    with ThreadPoolExecutor(max_workers=LOAD_WORKERS) as executor:
+        entries = list(shard_entries.values())
+        entries.extend(e for e in executor.map(read_round_numbers, paths) if e is not None)
 
+    # Let Counter do the tallying in C; out-of-range values are simply never read back
+    all_numbers = []
+    all_bonuses = []
+    for numbers, bonus in entries:
+        all_numbers.append(numbers)
+        all_bonuses.append(bonus)
+    count = len(all_bonuses)
+    main_counter = Counter(itertools.chain.from_iterable(all_numbers))
+    bonus_counter = Counter(all_bonuses)
+
+    frequency = {
+        str(i): {'main': main_counter[i], 'bonus': bonus_counter[i], 'total': main_counter[i] + bonus_counter[i]}
+        for i in range(1, 46)
+    }
     sorted_by_total = sorted(frequency.items(), key=lambda x: x[1]['total'], reverse=True)
     
     output_data = {
@@ -307,8 +740,7 @@ def update_frequency_data():
     }
 
     freq_file = os.path.join(DATA_DIR, FREQUENCY_FILE)
-    with open(freq_file, 'w', encoding='utf-8') as f:
-        json.dump(output_data, f, ensure_ascii=False, indent=4)
+    _dump_json(freq_file, output_data)
     
     print(f"Frequency data updated based on {count} rounds. Saved to {freq_file}")
 
@@ -318,8 +750,19 @@ def main():
     # Migrate existing files to subfolders if necessary
     migrate_existing_files()
     
+    # Scan the data directory once and share the listing below
+    round_files = scan_lotto_files()
+    
     # Update analysis data for existing files
-    update_existing_files_with_analysis()
+    updated_count = update_existing_files_with_analysis(round_files)
+    
+    # Build the consolidated rounds file on first run, after rewrites, when an
+    # interrupted append left it out of step with its index, or when round
+    # files exist that it does not cover
+    shard_rounds = load_rounds_index()
+    if (updated_count or not rounds_shard_is_consistent()
+            or any(round_num not in shard_rounds for round_num, _ in round_files)):
+        migrate_to_jsonl(round_files)
     
     print("Initializing Selenium...")
     latest_round, driver = get_latest_round_and_setup_driver()
@@ -334,25 +777,39 @@ def main():
         if latest_round > 0:
             save_latest_round_number(latest_round)
         
-        saved_rounds = get_saved_rounds()
+        saved_rounds = get_saved_rounds(round_files)
         last_saved = saved_rounds[-1] if saved_rounds else 0
         print(f"Last saved round: {last_saved}")
         
-        if latest_round > last_saved:
-            start = last_saved + 1
-            end = latest_round
+        # Fetch every round that has no file yet, not just those past the last
+        # saved one, so a chunk that failed on an earlier run is retried
+        missing = sorted(set(range(1, latest_round + 1)) - set(saved_rounds))
+        if missing:
+            gaps = [r for r in missing if r < last_saved]
+            if gaps:
+                print(f"Refetching {len(gaps)} missing rounds below {last_saved}")
+            all_results = fetch_rounds_with_api(missing)
+            fetched = {result['round'] for result in all_results}
             
+            # Fall back to the result page for anything the API did not return
+            remaining = [r for r in missing if r not in fetched]
             chunk_size = 10
-            for i in range(start, end + 1, chunk_size):
-                chunk_end = min(i + chunk_size - 1, end)
-                results = fetch_range_with_selenium(driver, i, chunk_end)
-                
-                for result in results:
-                    save_result(result)
+            if remaining:
+                ranges = []
+                for r in remaining:
+                    if not ranges or r > ranges[-1][1]:
+                        ranges.append((r, min(r + chunk_size - 1, latest_round)))
+                results = fetch_ranges_with_selenium(driver, ranges)
+                wanted = set(remaining)
+                all_results.extend(r for r in results if r['round'] in wanted)
+            
+            # Write everything after the fetch phase in one batch
+            save_results(all_results)
+            round_files.extend((r['round'], get_round_file_path(r['round'])) for r in all_results)
         else:
             print("Already up to date.")
             
-        update_frequency_data()
+        update_frequency_data(round_files)
             
     finally:
         driver.quit()
@@ -0,0 +1,40 @@
+import os
+import struct
+import orjson
+
+# Shared by the crawler and the analyzers, which both read round data from here
+DATA_DIR = 'lotto_data'
+# Consolidated copy of every round file, one JSON record per line
+ROUNDS_FILE = os.path.join(DATA_DIR, 'rounds.jsonl')
+ROUNDS_INDEX_FILE = os.path.join(DATA_DIR, 'rounds.idx')
+# rounds.idx record: (round_num, byte_offset, length) of a line in rounds.jsonl
+INDEX_RECORD = struct.Struct('<III')
+# Round files are small, so reads are mostly IO wait; scale the pool with the CPU count
+LOAD_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
+def read_json(path):
+    """
+    Returns the parsed contents of a JSON file, or None if it is missing
+    (a round not drawn or not collected yet) or cannot be parsed.
+    """
+    try:
+        with open(path, 'rb') as f:
+            return orjson.loads(f.read())
+    except FileNotFoundError:
+        return None
+    except Exception as e:
+        print(f"Error reading {path}: {e}")
+        return None
+
+def load_rounds_index():
+    """
+    Returns {round_num: (byte_offset, length)} from rounds.idx, or {} if it
+    does not exist. A record cut short by an interrupted write is ignored.
+    """
+    try:
+        with open(ROUNDS_INDEX_FILE, 'rb') as f:
+            buf = f.read()
+    except FileNotFoundError:
+        return {}
+    buf = buf[:len(buf) - len(buf) % INDEX_RECORD.size]
+    return {r: (offset, length) for r, offset, length in INDEX_RECORD.iter_unpack(buf)}
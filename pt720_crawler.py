@@ -1,6 +1,6 @@
 import requests
 from bs4 import BeautifulSoup
-import json
+import orjson
 import os
 import time
 from collections import Counter
@@ -13,8 +13,7 @@ urllib3.disable_warnings(urllib3.exceptions.InsecureRequestWarning)
 class PT720Crawler:
     def __init__(self):
         self.data_dir = "pt720_data"
-        if not os.path.exists(self.data_dir):
-            os.makedirs(self.data_dir)
+        os.makedirs(self.data_dir, exist_ok=True)
             
         self.latest_round_file = os.path.join(self.data_dir, "latest.pt7")
         self.frequency_file = os.path.join(self.data_dir, "frequency.pt7")
@@ -47,7 +46,7 @@ class PT720Crawler:
                 print(f"서버 응답 오류 (Status: {response.status_code})")
                 return 0
             
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             # 페이지에 명시된 가장 높은 회차 번호를 찾음
             highest_candidate = 0
@@ -94,7 +93,7 @@ class PT720Crawler:
             self.session.headers.update({'Referer': "https://www.dhlottery.co.kr/pt720/result"})
             response = self.session.get(url, timeout=15, verify=False)
             response.encoding = 'euc-kr'
-            soup = BeautifulSoup(response.text, 'html.parser')
+            soup = BeautifulSoup(response.text, 'lxml')
             
             title_span = soup.find('span', class_='psltEpsd')
             if not title_span or re.sub(r'[^0-9]', '', title_span.text) != str(round_num):
@@ -219,8 +218,8 @@ class PT720Crawler:
                     print(f"\n{r}회차 수집 실패. 프로세스를 중단합니다.")
                     break
                 
-                with open(os.path.join(self.data_dir, f"{r}.pt7"), 'w', encoding='utf-8') as f:
-                    json.dump(data, f, ensure_ascii=False, indent=4)
+                with open(os.path.join(self.data_dir, f"{r}.pt7"), 'wb') as f:
+                    f.write(orjson.dumps(data, option=orjson.OPT_INDENT_2))
                 with open(self.latest_round_file, 'w', encoding='utf-8') as f:
                     f.write(str(r))
                 
@@ -249,8 +248,8 @@ class PT720Crawler:
         for r in sorted(existing_files):
             file_path = os.path.join(self.data_dir, f"{r}.pt7")
             try:
-                with open(file_path, 'r', encoding='utf-8') as f:
-                    data = json.load(f)
+                with open(file_path, 'rb') as f:
+                    data = orjson.loads(f.read())
                     jo, winning_nums, bonus_nums = data.get('winning_group'), data.get('winning_numbers', []), data.get('bonus_numbers', [])
                     if jo: freq_jo[jo] += 1
                     for i, n in enumerate(winning_nums):
@@ -260,7 +259,7 @@ class PT720Crawler:
                         freq_bonus[i+1][n] += 1
                         freq_all_nums[n] += 1
                     valid_count += 1
-            except (json.JSONDecodeError, KeyError):
+            except (orjson.JSONDecodeError, KeyError):
                 continue
         
         freq_data = {
@@ -271,8 +270,9 @@ class PT720Crawler:
             "overall_number_frequency": dict(sorted(freq_all_nums.items()))
         }
         
-        with open(self.frequency_file, 'w', encoding='utf-8') as f:
-            json.dump(freq_data, f, ensure_ascii=False, indent=4)
+        # 빈도 dict는 정수 키를 쓰므로 OPT_NON_STR_KEYS로 문자열 키로 변환해 저장
+        with open(self.frequency_file, 'wb') as f:
+            f.write(orjson.dumps(freq_data, option=orjson.OPT_INDENT_2 | orjson.OPT_NON_STR_KEYS))
         print(f"분석 보고서(frequency.pt7) 갱신 완료 (총 {valid_count}회차)")
 
 if __name__ == "__main__":
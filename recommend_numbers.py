@@ -1,16 +1,37 @@
+import os
 import random
+import orjson
 from collections import Counter
-from itertools import combinations
-from analyze_pattern import LottoAnalyzer
+from itertools import accumulate, combinations
+from analyze_pattern import CACHE_DIR, LottoAnalyzer
+from lotto_store import DATA_DIR
+
+# 가중치 추첨 시 한 번에 뽑는 후보 수 (중복을 제외하고 6개를 채우기에 충분한 크기)
+DRAW_BATCH = 24
+# 최신 트렌드 분석에 쓰는 최근 회차 수
+RECENT_ROUNDS = 30
+FREQUENCY_FILE = os.path.join(DATA_DIR, "frequency.lotto")
+# 궁합수 누적 캐시 (로컬 전용): {"last_round": N, "pairs": [[a, b, count], ...]}
+# last_round 는 1회부터 빠짐없이 실제로 읽어 집계한 마지막 회차 (latest.lotto 값이 아님)
+PAIRS_FILE = os.path.join(CACHE_DIR, "pairs.json")
+# 번호 n을 n번째 비트로 표현할 때의 홀수(1,3,...,45) / 고번호(23~45) 마스크
+ODD_MASK = sum(1 << n for n in range(1, 46, 2))
+HIGH_MASK = sum(1 << n for n in range(23, 46))
 
 class LottoRecommender:
     def __init__(self):
         self.latest_round = self._get_latest_round()
-        # 전체 데이터 로드 (1회부터 최신회차까지)
-        self.analyzer = LottoAnalyzer(1, self.latest_round)
-        self.all_data = self.analyzer.data
-        # 최근 30회차 데이터 (최신 트렌드 분석용)
-        self.recent_data = self.analyzer.data[-30:] if len(self.analyzer.data) >= 30 else self.analyzer.data
+        # 최근 30회차 데이터만 로드 (최신 트렌드/미출현 분석용)
+        self.analyzer = LottoAnalyzer(max(1, self.latest_round - RECENT_ROUNDS + 1), self.latest_round)
+        self.recent_data = self.analyzer.data
+
+        # 전략별 통계는 데이터가 바뀌지 않으므로 한 번만 계산해 둠
+        # 전체 빈도와 궁합수는 저장된 집계 파일을 사용해 전체 회차를 다시 읽지 않음
+        self._hot_total = self._load_total_counts()
+        self._hot_recent = self._get_hot_numbers(self.recent_data)
+        self._cold15 = self._get_cold_numbers(15)
+        self._pair_weights = self._load_pair_weights()
+        self._total_choices = self._to_choices({n: self._hot_total.get(n, 0) for n in range(1, 46)})
 
     def _get_latest_round(self):
         try:
@@ -19,6 +40,49 @@ class LottoRecommender:
         except:
             return 1000 # 기본값
 
+    def _load_total_counts(self):
+        """크롤러가 갱신한 frequency.lotto 의 본번호 출현 횟수를 읽음 (없으면 전체 회차를 집계)"""
+        try:
+            with open(FREQUENCY_FILE, 'rb') as f:
+                stats = orjson.loads(f.read())['stats']
+            return Counter({n: stats[str(n)]['main'] for n in range(1, 46)})
+        except (FileNotFoundError, KeyError, orjson.JSONDecodeError):
+            return self._get_hot_numbers(LottoAnalyzer(1, self.latest_round).data)
+
+    def _load_pair_weights(self):
+        """궁합수 캐시를 읽고, 캐시 이후 추가된 회차만 더해 궁합수 빈도를 반환"""
+        cached_round = 0
+        pair_counts = Counter()
+        try:
+            with open(PAIRS_FILE, 'rb') as f:
+                cache = orjson.loads(f.read())
+            if cache['last_round'] <= self.latest_round:
+                cached_round = cache['last_round']
+                pair_counts = Counter({(a, b): c for a, b, c in cache['pairs']})
+        except (FileNotFoundError, KeyError, ValueError, TypeError, orjson.JSONDecodeError):
+            pass
+
+        if cached_round < self.latest_round:
+            new_data = LottoAnalyzer(cached_round + 1, self.latest_round).data
+            # latest.lotto 는 수집 전에 갱신되므로 아직 없는 회차가 있을 수 있음
+            # 빠진 회차 없이 이어지는 구간까지만 캐시에 반영하고, 그 뒤는 이번 실행에서만 더함
+            covered = 0
+            while covered < len(new_data) and new_data[covered]['round'] == cached_round + covered + 1:
+                covered += 1
+            pair_counts.update(self._get_pair_weights(new_data[:covered]))
+            if covered:
+                cache = {
+                    'last_round': cached_round + covered,
+                    'pairs': [[a, b, c] for (a, b), c in pair_counts.items()],
+                }
+                os.makedirs(CACHE_DIR, exist_ok=True)
+                tmp_path = PAIRS_FILE + ".tmp"
+                with open(tmp_path, 'wb') as f:
+                    f.write(orjson.dumps(cache))
+                os.replace(tmp_path, PAIRS_FILE)
+            pair_counts.update(self._get_pair_weights(new_data[covered:]))
+        return pair_counts
+
     def _get_hot_numbers(self, data_source):
         """주어진 데이터 소스에서 번호별 출현 빈도를 반환"""
         nums = [n for d in data_source for n in d['numbers']]
@@ -40,64 +104,73 @@ class LottoRecommender:
                 pair_counts[pair] += 1
         return pair_counts
 
-    def _generate_weighted_set(self, weights):
-        """가중치를 기반으로 6개 번호 생성"""
-        numbers = list(weights.keys())
-        probs = list(weights.values())
+    def _to_choices(self, weights):
+        """가중치 dict를 random.choices에 바로 넘길 (번호, 누적 가중치) 튜플 쌍으로 변환"""
+        # 누적 가중치를 미리 만들어 두면 random.choices가 호출마다 다시 누적하지 않음
+        return tuple(weights.keys()), tuple(accumulate(weights.values()))
+
+    def _generate_weighted_set(self, choices):
+        """가중치를 기반으로 6개 번호 생성 (choices: _to_choices 결과)"""
+        numbers, cum_weights = choices
         
         selected = set()
         while len(selected) < 6:
-            pick = random.choices(numbers, weights=probs, k=1)[0]
-            selected.add(pick)
+            # 한 번의 호출로 여러 개를 뽑아 앞에서부터 중복 없이 채움 (1개씩 뽑는 것과 같은 분포)
+            for pick in random.choices(numbers, cum_weights=cum_weights, k=DRAW_BATCH):
+                selected.add(pick)
+                if len(selected) == 6:
+                    break
         return sorted(list(selected))
 
-    def _generate_pair_based_set(self, pair_weights):
+    def _generate_pair_based_set(self, top_pairs, total_choices):
         """상위 궁합수를 포함한 번호 조합 생성"""
         # 상위 100개 페어 중 하나를 랜덤 선택하여 시작
-        top_pairs = pair_weights.most_common(100)
         if not top_pairs:
-            return self._generate_weighted_set({i:1 for i in range(1,46)})
+            return self._generate_weighted_set(self._to_choices({i:1 for i in range(1,46)}))
             
         start_pair = random.choice(top_pairs)[0]
         selected = set(start_pair)
         
         # 나머지는 전체 빈도 가중치로 채움
-        total_counts = self._get_hot_numbers(self.all_data)
-        weights = {n: total_counts.get(n, 0) for n in range(1, 46)}
-        
+        numbers, cum_weights = total_choices
         while len(selected) < 6:
-            pick = random.choices(list(weights.keys()), weights=list(weights.values()), k=1)[0]
-            selected.add(pick)
+            for pick in random.choices(numbers, cum_weights=cum_weights, k=DRAW_BATCH):
+                selected.add(pick)
+                if len(selected) == 6:
+                    break
             
         return sorted(list(selected))
 
     def _check_filters(self, numbers):
         """생성된 번호 조합이 로또 통계적 필터를 통과하는지 검사"""
-        sorted_nums = sorted(numbers)
+        # 번호 n을 n번째 비트로 두면 각 필터가 정수 비트 연산 한두 번으로 끝남
+        mask = 0
+        for n in numbers:
+            mask |= 1 << n
         
         # 1. 총합 필터 (일반적으로 100~200 사이가 가장 많음)
         s = sum(numbers)
         if not (100 <= s <= 200): return False
         
         # 2. 홀짝 비율 (0:6 또는 6:0 제외)
-        odds = sum(1 for n in numbers if n % 2 != 0)
+        odds = bin(mask & ODD_MASK).count('1')
         if odds == 0 or odds == 6: return False
         
         # 3. 고저 비율 (1~22: 저, 23~45: 고) - 0:6 또는 6:0 제외
-        highs = sum(1 for n in numbers if n >= 23)
+        highs = bin(mask & HIGH_MASK).count('1')
         if highs == 0 or highs == 6: return False
 
-        # 4. 3연번 제외 (예: 1, 2, 3)
-        for i in range(len(sorted_nums)-2):
-            if sorted_nums[i+1] == sorted_nums[i]+1 and sorted_nums[i+2] == sorted_nums[i]+2:
-                return False
+        # 4. 3연번 제외 (예: 1, 2, 3) - n, n+1, n+2 비트가 모두 켜져 있으면 탈락
+        if mask & (mask >> 1) & (mask >> 2): return False
         
         # 5. AC값 (산술적 복잡도) >= 7 (대부분의 당첨번호는 7 이상)
-        diffs = set()
+        # 차이값은 1~44 이므로 set 대신 비트마스크에 모아 켜진 비트 수를 셈
+        diffs = 0
         for i in range(6):
+            a = numbers[i]
             for j in range(i+1, 6):
-                diffs.add(sorted_nums[j] - sorted_nums[i])
-        ac = len(diffs) - 5
+                diffs |= 1 << abs(numbers[j] - a)
+        ac = bin(diffs).count('1') - 5
         if ac < 7: return False
 
         return True
@@ -106,44 +179,41 @@ class LottoRecommender:
         recommendations = []
         
         # [전략 1] 최근 트렌드(Hot) 중심 - 5조합
-        hot_counts = self._get_hot_numbers(self.recent_data)
-        weights_hot = {n: 1 + hot_counts.get(n, 0) for n in range(1, 46)}
+        hot_counts = self._hot_recent
+        choices_hot = self._to_choices({n: 1 + hot_counts.get(n, 0) for n in range(1, 46)})
         
         count = 0
         while count < 5:
-            nums = self._generate_weighted_set(weights_hot)
+            nums = self._generate_weighted_set(choices_hot)
             if self._check_filters(nums):
                 recommendations.append(("최근 트렌드(Hot)", nums))
                 count += 1
 
         # [전략 2] 미출현(Cold) 번호 공략 - 5조합
-        cold_nums = self._get_cold_numbers(15)
-        weights_cold = {n: 10 if n in cold_nums else 1 for n in range(1, 46)}
+        cold_nums = set(self._cold15)
+        choices_cold = self._to_choices({n: 10 if n in cold_nums else 1 for n in range(1, 46)})
         
         count = 0
         while count < 5:
-            nums = self._generate_weighted_set(weights_cold)
+            nums = self._generate_weighted_set(choices_cold)
             if self._check_filters(nums):
                 recommendations.append(("미출현 번호(Cold)", nums))
                 count += 1
 
         # [전략 3] 전체 통계 기반 균형 - 5조합
-        total_counts = self._get_hot_numbers(self.all_data)
-        weights_total = {n: total_counts.get(n, 0) for n in range(1, 46)}
-        
         count = 0
         while count < 5:
-            nums = self._generate_weighted_set(weights_total)
+            nums = self._generate_weighted_set(self._total_choices)
             if self._check_filters(nums):
                 recommendations.append(("전체 통계 균형", nums))
                 count += 1
 
         # [전략 4] 동반 출현(Pair) 궁합수 - 5조합
-        pair_weights = self._get_pair_weights(self.all_data)
+        top_pairs = self._pair_weights.most_common(100)
         
         count = 0
         while count < 5:
-            nums = self._generate_pair_based_set(pair_weights)
+            nums = self._generate_pair_based_set(top_pairs, self._total_choices)
             if self._check_filters(nums):
                 recommendations.append(("동반 출현(Pair)", nums))
                 count += 1